@@ -30,17 +30,39 @@ EXAMPLES::
 
 
 
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import Pool
+
 from sage.groups.braid import BraidGroup
-from sage.groups.perm_gps.permgroup_named import SymmetricGroup
 from sage.rings.rational_field import QQ
 from sage.rings.qqbar import QQbar
 from scipy.spatial import Voronoi
-from numpy import array, vstack
+import numpy as np
 from sage.rings.all import CC, CIF
 from sage.rings.complex_field import ComplexField
+from sage.rings.real_mpfr import RealField
 from sage.rings.complex_interval_field import ComplexIntervalField
+from sage.parallel.ncpus import ncpus
+
 
 
+def _merge_events(ts):
+    """
+    Merge the sorted per-strand time arrays ``ts`` into one increasing
+    sequence of distinct event times.
+
+    The strands are already sorted in time, so an S-way heap merge costs
+    O(log S) per event instead of a scan over all strands.
+    """
+    previous = None
+    for t in heapq.merge(*[a.tolist() for a in ts]):
+        if t != previous:
+            yield t
+            previous = t
+
 
 def braid_from_piecewise(strands):
     """
@@ -65,55 +87,50 @@ def braid_from_piecewise(strands):
 
     """
     L = strands
-    i = min([L[k][1][0] for k in range(len(L))])
-    totalpoints = [[[a[0][1].real(), a[0][1].imag()]] for a in L]
-    indices = [1 for a in range(len(L))]
-    while i < 1:
-        for j in range(len(L)):
-            if L[j][indices[j]][0] > i:
-                xaux = L[j][indices[j] - 1][1]
-                yaux = L[j][indices[j]][1]
-                aaux = L[j][indices[j] - 1][0]
-                baux = L[j][indices[j]][0]
-                interpola = xaux + (yaux - xaux)*(i - aaux)/(baux - aaux)
-                totalpoints[j].append([interpola.real(), interpola.imag()])
-            else:
-                totalpoints[j].append([L[j][indices[j]][1].real(), L[j][indices[j]][1].imag()])
-                indices[j] = indices[j] + 1
-        i = min([L[k][indices[k]][0] for k in range(len(L))])
-    for j in range(len(L)):
-         totalpoints[j].append([L[j][-1][1].real(), L[j][-1][1].imag()])
+    S = len(L)
+    ts = [np.array([p[0] for p in strand], dtype=np.float64) for strand in L]
+    ys = [np.array([complex(p[1]) for p in strand], dtype=np.complex128) for strand in L]
+    events = np.fromiter(_merge_events(ts), dtype=np.float64)
+    totalpoints = []
+    for j in range(S):
+        re = np.interp(events, ts[j], ys[j].real)
+        im = np.interp(events, ts[j], ys[j].imag)
+        totalpoints.append(np.column_stack([re, im]))
+    totalpoints = np.stack(totalpoints)
     braid = []
-    G = SymmetricGroup(len(totalpoints))
-    for i in range(len(totalpoints[0]) - 1):
-        l1 = [totalpoints[j][i] for j in range(len(L))]
-        l2 = [totalpoints[j][i+1] for j in range(len(L))]
-        M = [[l1[s], l2[s]] for s in range(len(l1))]
-        M.sort()
-        l1 = [a[0] for a in M]
-        l2 = [a[1] for a in M]
-        cruces = []
-        for j in range(len(l2)):
-            for k in range(j):
-                if l2[j] < l2[k]:
-                    t = (l1[j][0] - l1[k][0])/(l2[k][0] - l1[k][0] + l1[j][0] - l2[j][0])
-                    s = cmp(l1[k][1]*(1 - t) + t*l2[k][1], l1[j][1]*(1 - t) + t*l2[j][1])
-                    cruces.append([t, k, j, -s])
+    k_idx, j_idx = np.triu_indices(S, 1)
+    for i in range(len(events) - 1):
+        l1 = totalpoints[:, i]
+        l2 = totalpoints[:, i+1]
+        order = np.lexsort((l2[:, 1], l2[:, 0], l1[:, 1], l1[:, 0]))
+        l1 = l1[order]
+        l2 = l2[order]
+        crossed = ((l2[j_idx, 0] < l2[k_idx, 0])
+                   | ((l2[j_idx, 0] == l2[k_idx, 0]) & (l2[j_idx, 1] < l2[k_idx, 1])))
+        ks = k_idx[crossed]
+        js = j_idx[crossed]
+        t = (l1[js, 0] - l1[ks, 0])/(l2[ks, 0] - l1[ks, 0] + l1[js, 0] - l2[js, 0])
+        s = np.sign(l1[ks, 1]*(1 - t) + t*l2[ks, 1] - (l1[js, 1]*(1 - t) + t*l2[js, 1]))
+        cruces = [[t[m], int(ks[m]), int(js[m]), -int(s[m])] for m in range(len(t))]
         if len(cruces) > 0:
             cruces.sort()
-            P = G(Permutation([]))
+            # lookup table playing the role of the permutation P:
+            # P[k] is the image of the (1-based) strand position k
+            P = list(range(S + 1))
             while cruces:
                 # we select the crosses in the same t
                 crucesl = [c for c in cruces if c[0]==cruces[0][0]]
-                crossesl = [(P(c[2]+1) - P(c[1]+1),c[1],c[2],c[3]) for c in crucesl]
+                crossesl = [(P[c[2]+1] - P[c[1]+1],c[1],c[2],c[3]) for c in crucesl]
                 cruces = cruces[len(crucesl):]
                 while crossesl:
                     crossesl.sort()
                     c = crossesl.pop(0)
-                    braid.append(c[3]*min(map(P, [c[1] + 1, c[2] + 1])))
-                    P = G(Permutation([(c[1] + 1, c[2] + 1)]))*P
-                    crossesl = [(P(c[2]+1) - P(c[1]+1),c[1],c[2],c[3]) for c in crossesl]
-    B = BraidGroup(len(L))
+                    a = c[1] + 1
+                    b = c[2] + 1
+                    braid.append(c[3]*min(P[a], P[b]))
+                    P[a], P[b] = P[b], P[a]
+                    crossesl = [(P[c[2]+1] - P[c[1]+1],c[1],c[2],c[3]) for c in crossesl]
+    B = BraidGroup(S)
     return B(braid)
 
 
@@ -143,7 +160,7 @@ def discrim(f):
     """
     x, y = f.variables()
     F = f.base_ring()
-    disc = F[x](f.discriminant(y).resultant(f, y)).roots(QQbar, multiplicities = False)
+    disc = F[x](f.discriminant(y)).roots(QQbar, multiplicities = False)
     return disc
 
 
@@ -184,18 +201,33 @@ def segments(points):
         1.26513881334184 - 2.19128470333546*I)]
 
     """
-    discpoints = array([(CC(a).real(), CC(a).imag()) for a in points])
-    added_points = 3*abs(discpoints).max() + 1.0
-    configuration = vstack([discpoints, array([[added_points, 0], [-added_points, 0], [0, added_points],[0, -added_points]])])
+    disc_c = np.array([complex(CC(a)) for a in points], dtype=np.complex128)
+    discpoints = disc_c.view(np.float64).reshape(-1, 2)
+    added_points = 3*np.abs(discpoints).max() + 1.0
+    configuration = np.vstack([discpoints, np.array([[added_points, 0], [-added_points, 0], [0, added_points], [0, -added_points]])])
     V = Voronoi(configuration)
+    rv = np.asarray(V.ridge_vertices)
+    bounded = rv[(rv >= 0).all(axis=1)]
     res = []
-    for rv in V.ridge_vertices:
-        if not -1 in rv:
-            p1 = CC(list(V.vertices[rv[0]]))
-            p2 = CC(list(V.vertices[rv[1]]))
-            res.append((p1, p2))
+    for (a1, b1), (a2, b2) in V.vertices[bounded]:
+        res.append((CC(a1, b1), CC(a2, b2)))
     return res
 
+@lru_cache(maxsize=32)
+def _qqbar_polynomial(f):
+    """
+    The polynomial ``f`` with its coefficients coerced into QQbar.
+    """
+    return f.change_ring(QQbar)
+
+@lru_cache(maxsize=32)
+def _interval_polynomial(f, prec):
+    """
+    The polynomial ``f`` with its coefficients coerced into the complex
+    interval field with ``prec`` bits, through the cached QQbar version.
+    """
+    return _qqbar_polynomial(f).change_ring(ComplexIntervalField(prec))
+
 def followstrand(f, x0, x1, y0a, prec=53):
     """
     Return a piecewise linear aproximation of the homotopy continuation of the root y0a
@@ -245,18 +277,20 @@ def followstrand(f, x0, x1, y0a, prec=53):
     """
     CIF = ComplexIntervalField(prec)
     CC = ComplexField(prec)
-    G = f.change_ring(QQbar).change_ring(CIF)
+    G = _interval_polynomial(f, prec)
     (x, y) = G.variables()
     g = G.subs({x: (1-x)*CIF(x0) + x*CIF(x1)})
-    coefs = []
     deg = g.total_degree()
-    for d in range(deg + 1):
-        for i in range(d + 1):
-            c = CIF(g.coefficient({x: d-i, y: i}))
-            cr = c.real()
-            ci = c.imag()
-            coefs += list(cr.endpoints())
-            coefs += list(ci.endpoints())
+    zero = RealField(prec).zero()
+    # flat buffer of interval endpoints, four per monomial, in the
+    # degree-major order that contpath expects
+    coefs = [zero] * (2*(deg + 1)*(deg + 2))
+    for e, c in g.dict().items():
+        d = e[0] + e[1]
+        c = CIF(c)
+        pos = 2*d*(d + 1) + 4*e[1]
+        coefs[pos], coefs[pos + 1] = c.real().endpoints()
+        coefs[pos + 2], coefs[pos + 3] = c.imag().endpoints()
     yr = CC(y0a).real()
     yi = CC(y0a).imag()
     try:
@@ -268,8 +302,37 @@ def followstrand(f, x0, x1, y0a, prec=53):
     except:
         return followstrand(f, x0, x1, y0a, 2*prec)
 
-@parallel
-def braid_in_segment(f, x0, x1):
+@lru_cache(maxsize=None)
+def _algebraic_point(z):
+    """
+    Exact QQbar representative of the floating point complex number ``z``.
+    """
+    return QQ(z.real()) + QQbar.gen()*QQ(z.imag())
+
+def _match_nearest(approximations, roots):
+    """
+    Return, for each approximate value, the index of the nearest root.
+
+    A ``ValueError`` is raised if two approximations are matched to the
+    same root.
+    """
+    aps = np.array([complex(a) for a in approximations], dtype=np.complex128)
+    rts = np.array([complex(a) for a in roots], dtype=np.complex128)
+    matches = np.abs(aps[:, None] - rts[None, :]).argmin(axis=1)
+    if len(set(matches)) < len(matches):
+        raise ValueError("different roots are too close")
+    return matches
+
+def _followstrand_star(args):
+    """
+    Unpack a tuple of arguments for ``followstrand``.
+
+    ``multiprocessing`` can only map a picklable top-level function of a
+    single argument over a pool.
+    """
+    return followstrand(*args)
+
+def braid_in_segment(f, x0, x1, y0s=None, y1s=None):
     """
     Return the braid formed by the y roots of f when x moves from
     x0 to x1
@@ -279,7 +342,9 @@ def braid_in_segment(f, x0, x1):
     - ``f`` -- a polynomial in two variables
     - ``x0`` -- a complex number
     - ``x1`` -- a complex number
-        
+    - ``y0s`` -- (optional) the roots in y of f at x0; computed if not given
+    - ``y1s`` -- (optional) the roots in y of f at x1; computed if not given
+
     - OUTPUT:
     
     A braid
@@ -296,40 +361,65 @@ def braid_in_segment(f, x0, x1):
     """
     CC = ComplexField(64)
     (x, y) = f.variables()
-    I = QQbar.gen()
-    X0 = QQ(x0.real()) + I*QQ(x0.imag())
-    X1 = QQ(x1.real()) + I*QQ(x1.imag())
-    F0 = QQbar[y](f(x=X0))
-    y0s = F0.roots(multiplicities=False)
-    strands = [followstrand(f, x0, x1, CC(a)) for a in y0s]
-    complexstrands = [[(a[0], CC(a[1], a[2])) for a in b] for b in strands]
+    if y0s is None:
+        y0s = QQbar[y](f(x=_algebraic_point(x0))).roots(multiplicities=False)
+    if len(y0s) <= 1:
+        # a single strand cannot cross anything; skip the homotopy
+        # continuation entirely (BraidGroup needs at least two strands)
+        return BraidGroup(max(len(y0s), 2)).one()
+    tasks = [(f, x0, x1, CC(a)) for a in y0s]
+    # the segments are already dispatched over ncpus() workers; only use
+    # an inner pool for the cores left over, to avoid oversubscription
+    nproc = max(1, (os.cpu_count() or 1) // ncpus())
+    if nproc > 1 and len(tasks) > 1:
+        pool = Pool(nproc)
+        try:
+            strands = pool.map(_followstrand_star, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        strands = [followstrand(*task) for task in tasks]
+    complexstrands = [[(float(a[0]), complex(a[1], a[2])) for a in b] for b in strands]
     centralbraid =  braid_from_piecewise(complexstrands)
     initialstrands = []
     y0aps = [c[0][1] for c in complexstrands]
-    used = []
-    for y0ap in y0aps:
-        distances = [((y0ap - y0).norm(), y0) for y0 in y0s]
-        y0 = sorted(distances)[0][1]
-        if y0 in used:
-            raise ValueError("different roots are too close")
-        used.append(y0)
-        initialstrands.append([(0, CC(y0)), (1, y0ap)])
+    for y0ap, k in zip(y0aps, _match_nearest(y0aps, y0s)):
+        initialstrands.append([(0, complex(y0s[k])), (1, y0ap)])
     initialbraid = braid_from_piecewise(initialstrands)
-    F1 = QQbar[y](f(x=X1))
-    y1s = F1.roots(multiplicities=False)
+    if y1s is None:
+        y1s = QQbar[y](f(x=_algebraic_point(x1))).roots(multiplicities=False)
     finalstrands = []
     y1aps = [c[-1][1] for c in complexstrands]
-    used = []
-    for y1ap in y1aps:
-        distances = [((y1ap - y1).norm(), y1) for y1 in y1s]
-        y1 = sorted(distances)[0][1]
-        if y1 in used:
-            raise ValueError("different roots are too close")
-        used.append(y1)
-        finalstrands.append([(0, y1ap), (1, CC(y1))])
+    for y1ap, k in zip(y1aps, _match_nearest(y1aps, y1s)):
+        finalstrands.append([(0, y1ap), (1, complex(y1s[k]))])
     finallbraid = braid_from_piecewise(finalstrands)
     return initialbraid*centralbraid*finallbraid
 
+_worker_poly = None
+
+def _init_worker(g):
+    """
+    Store the polynomial in the worker process, so it travels to each
+    worker once instead of being pickled with every segment.
+    """
+    global _worker_poly
+    _worker_poly = g
+
+def _braid_in_segment_task(args):
+    """
+    Compute the braid of one segment against the polynomial installed
+    by ``_init_worker``.
+    """
+    x0, x1, y0s, y1s = args
+    return braid_in_segment(_worker_poly, x0, x1, y0s, y1s)
+
+def _point_key(p):
+    """
+    Hashable pair of native floats identifying the complex point ``p``.
+    """
+    return (float(p.real()), float(p.imag()))
+
 def fundamental_group(f, simplified=True, projective = False):
     """
     Return a presentation of the fundamental group of the complement of the algebraic
@@ -400,19 +490,32 @@ def fundamental_group(f, simplified=True, projective = False):
         d = g.degree(y)
     disc = discrim(g)
     segs = segments(disc)
-    vertices = list(set(flatten(segs)))
+    vindex = {}
+    vertices = []
+    for seg in segs:
+        for p in seg:
+            key = _point_key(p)
+            if key not in vindex:
+                vindex[key] = len(vertices)
+                vertices.append(p)
     Faux = FreeGroup(d)
     F = FreeGroup(d * len(vertices))
     rels = []
     if projective:
         rels.append(prod(F.gen(i) for i in range(d)))
-    braidscomputed = braid_in_segment([(g, seg[0], seg[1]) for seg in segs])
-    #braidscomputed = [(((g, seg[0], seg[1]), ), braid_in_segment(g,seg[0], seg[1])) for seg in segs]
-    for braidcomputed in braidscomputed:
-        seg = (braidcomputed[0][0][1], braidcomputed[0][0][2])
-        b = braidcomputed[1]
-        i = vertices.index(seg[0])
-        j = vertices.index(seg[1])
+    vertex_roots = [QQbar[y](g(x=_algebraic_point(v))).roots(multiplicities=False)
+                    for v in vertices]
+    tasks = [(seg[0], seg[1],
+              vertex_roots[vindex[_point_key(seg[0])]],
+              vertex_roots[vindex[_point_key(seg[1])]])
+             for seg in segs]
+    with ProcessPoolExecutor(max_workers=ncpus(),
+                             initializer=_init_worker,
+                             initargs=(g,)) as executor:
+        braids = list(executor.map(_braid_in_segment_task, tasks))
+    for seg, b in zip(segs, braids):
+        i = vindex[_point_key(seg[0])]
+        j = vindex[_point_key(seg[1])]
         for k in range(d):
             el1 = Faux([k + 1]) * b.inverse()
             el2 = k + 1
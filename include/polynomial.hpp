@@ -51,11 +51,11 @@ public:
 	// MISC FUNCTIONS FOR HORNER
 	T evalPolClassic (const T &, const T &) const;
 	T evalIPolHornerXY (const T &, const T &) const {return T();}
-	T evalIPolHornerYX (const T &, const T &) const {return T();}
+	T evalIPolHornerYX (const T &, const T &) const;
 
 	T evalPolYClassic (const T &, const T &) const;
 	T evalIPolYHornerXY (const T &, const T &) const {return T();}
-	T evalIPolYHornerYX (const T &, const T &) const {return T();}
+	T evalIPolYHornerYX (const T &, const T &) const;
 
 
 	// CHANGE OF VARIABLE
@@ -225,9 +225,28 @@ T Polynomial<T>::evalPolClassic (const T &x, const T &y) const {
 }
 
 
+template <class T>
+T Polynomial<T>::evalIPolHornerYX (const T &x, const T &y) const {
+	// outer Horner scheme in y over inner Horner schemes in x:
+	// p(x,y) = sum_j P_j(x) y^j, with
+	// P_j(x) = sum_{i=j}^{degree} coef[(i*(i+1))/2 + j] x^(i-j),
+	// so each coefficient costs one multiply-add instead of the
+	// two multiplications of the precomputed-powers evaluation
+	T rop;
+	T pj;
+	for (int j=this->degree; j>=0; --j) {
+		pj = (this->coef)[(this->degree*(this->degree+1))/2 + j];
+		for (int i=this->degree-1; i>=j; --i)
+			pj = pj * x + (this->coef)[(i*(i+1))/2 + j];
+		rop = rop * y + pj;
+	}
+	return rop;
+}
+
+
 template <class T>
 T Polynomial<T>::operator() (const T &x, const T &y) const {
-	return this->evalPolClassic (x,y);
+	return this->evalIPolHornerYX (x,y);
 }
 
 template <class T>
@@ -306,9 +325,26 @@ T Polynomial<T>::evalPolYClassic (const T &x, const T &y) const {
 }
 
 
+template <class T>
+T Polynomial<T>::evalIPolYHornerYX (const T &x, const T &y) const {
+	// Horner form of the y-derivative:
+	// p_y(x,y) = sum_{j=1}^{degree} T(j) P_j(x) y^(j-1),
+	// with the same inner schemes P_j(x) as evalIPolHornerYX
+	T rop;
+	T pj;
+	for (int j=this->degree; j>=1; --j) {
+		pj = (this->coef)[(this->degree*(this->degree+1))/2 + j];
+		for (int i=this->degree-1; i>=j; --i)
+			pj = pj * x + (this->coef)[(i*(i+1))/2 + j];
+		rop = rop * y + T(j) * pj;
+	}
+	return rop;
+}
+
+
 template <class T>
 T Polynomial<T>::diffY (const T &x, const T &y) const {
-	return this->evalPolYClassic (x,y);
+	return this->evalIPolYHornerYX (x,y);
 }
 
 